@@ -1,63 +1,113 @@
-from openai import OpenAI
-import json
-from config import OPENAI_API_KEY, OPENAI_MODEL
+import re
+import hashlib
+from collections import OrderedDict
+from config import OPENAI_MODEL, OPENAI_PROMPT_MODEL, PROMPT_CACHE_SIZE, IMAGE_PROMPT_MAX_TOKENS
+from config.openai_client import get_openai_client
 from database.models import Scene
 from utils.utils import scene_to_text
 
+SYSTEM_PROMPT = ("You are a helpful assistant for determining visualizability and generating image prompts. "
+                 "Generate an image for the section of a Dungeons and Dragons session given by the user "
+                 "if there is something that is visualizable. "
+                 "Reply with only the image prompt text, or exactly NONE if nothing is visualizable.")
+
+# Reply meaning the transcript has nothing to draw, plus the paraphrases models use for it
+NOT_VISUALIZABLE = "NONE"
+# NONE must be the whole reply or be followed by a separator, so prompts like "None of the goblins..." pass
+_NOT_VISUALIZABLE_RE = re.compile(
+    r"^(?:NONE\s*(?:$|[-\u2013\u2014:(.,;!])"
+    r"|NOTHING (?:IS )?(?:VISUALIZABLE|TO (?:VISUALIZE|DRAW))\b"
+    r"|NOT VISUALIZABLE\b"
+    r"|THERE IS NOTHING (?:TO (?:VISUALIZE|DRAW)|VISUALIZABLE)\b)")
+_EDGE_PUNCTUATION = "\"'`*.,:;!-_ \n\t"
+# Openings of refusals and apologies, which are not usable image prompts
+_REFUSAL_RE = re.compile(
+    r"^(?:I'?M SORRY|I AM SORRY|SORRY|I APOLOGI[SZ]E|I CAN'?T|I CANNOT|I'?M UNABLE|I AM UNABLE|AS AN AI)\b")
+
+def is_not_visualizable(reply: str) -> bool:
+    """
+    Check whether a reply means there is nothing to draw, tolerating quotes, markdown,
+    punctuation and trailing explanations such as 'NONE - nothing to draw'.
+
+    >>> is_not_visualizable('"NONE"'), is_not_visualizable('NONE - nothing to draw')
+    (True, True)
+    >>> is_not_visualizable('Nothing is visualizable.')
+    True
+    >>> is_not_visualizable('None of the goblins notice the rogue slipping past the campfire')
+    False
+    >>> is_not_visualizable('There is nothing to stop the red dragon as it dives over the burning village')
+    False
+    """
+    normalized = reply.strip(_EDGE_PUNCTUATION).upper()
+    return bool(_NOT_VISUALIZABLE_RE.match(normalized))
+
+def is_refusal(reply: str) -> bool:
+    """Check whether a reply is a refusal or apology rather than an image prompt."""
+    normalized = reply.strip(_EDGE_PUNCTUATION).upper().replace("\u2019", "'")
+    return bool(_REFUSAL_RE.match(normalized))
+
 class OpenAIParser:
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_openai_client()
+        self.prompt_cache = OrderedDict()  # Hash of scene text + transcript -> generated prompt
 
     def generate_prompt(self, current_scene: Scene, raw_text: str) -> str:
-        functions = [
-            {
-                "name": "if_visualizable_then_generate_image",
-                "description": "generates an image for Dungeons and Dragons visualization",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "image_prompt": {"type": "string"},
-                    },
-                    "required": ["image_prompt"],
-                },
-            }
-        ]
+        scene_text = scene_to_text(current_scene)
 
+        # Identical scene and transcript (e.g. replayed samples) reuse the earlier answer
+        cache_key = hashlib.blake2b(f"{scene_text}\n{raw_text}".encode(), digest_size=16).hexdigest()
+        if cache_key in self.prompt_cache:
+            self.prompt_cache.move_to_end(cache_key)
+            return self.prompt_cache[cache_key]
+
+        generated_prompt = self.request_prompt(scene_text, raw_text)
+        self.prompt_cache[cache_key] = generated_prompt
+        if len(self.prompt_cache) > PROMPT_CACHE_SIZE:
+            self.prompt_cache.popitem(last=False)
+        return generated_prompt
+
+    def request_prompt(self, scene_text: str, raw_text: str) -> str:
+        generated_prompt = self._request_prompt(scene_text, raw_text, OPENAI_PROMPT_MODEL)
+
+        # The cheaper model refused or gave no usable prompt; ask the stronger one once
+        if generated_prompt == "" and OPENAI_PROMPT_MODEL != OPENAI_MODEL:
+            generated_prompt = self._request_prompt(scene_text, raw_text, OPENAI_MODEL)
+
+        return generated_prompt or None
+
+    def _request_prompt(self, scene_text: str, raw_text: str, model: str) -> str:
+        """
+        Returns:
+            str: The image prompt, "" if the reply was empty, filtered or a refusal,
+            or None if the model found nothing visualizable.
+        """
+        # Static instructions, then the scene, then the transcript, so calls share the longest prefix
         messages = [
             {"role": "system",
-             "content": "You are a helpful assistant for determining visualizability and generating image prompts."},
+             "content": SYSTEM_PROMPT},
             {"role": "system",
-             "content": scene_to_text(current_scene)},  # Providing scene and characters info to the model
+             "content": scene_text},  # Providing scene and characters info to the model
             {"role": "user",
-             "content": f"Generate an image for the following section of a Dungeons and Dragons session if there is something that is visualizable: {raw_text}"}
+             "content": raw_text}
         ]
 
         response = self.client.chat.completions.create(
-            model=OPENAI_MODEL,
+            model=model,
             messages=messages,
-            functions=functions
+            max_tokens=IMAGE_PROMPT_MAX_TOKENS
         )
 
-        # Adjusting response parsing to match the new response object format
-        response_message = response.choices[0].message
-
-        # Check if 'function_call' exists and is not None
-        if hasattr(response_message, 'function_call') and response_message.function_call:
-            # Directly access attributes of the Pydantic model
-            function_call = response_message.function_call
-            function_name = function_call.name
-            function_arguments = function_call.arguments
-
-            # Check if the function call is the expected one
-            if function_name == "if_visualizable_then_generate_image":
-                # Parse arguments from a JSON string to a dictionary
-                arguments = json.loads(function_arguments)
-                # Extract the generated prompt from the arguments dictionary
-                generated_prompt = arguments.get('image_prompt')
-                return generated_prompt
-
-        # Handle cases where the function call did not produce the expected output
-        return None
+        choice = response.choices[0]
+        if choice.finish_reason == "content_filter":
+            return ""
+
+        # A plain-text reply: the prompt itself, or NOT_VISUALIZABLE
+        generated_prompt = (choice.message.content or "").strip()
+        if is_not_visualizable(generated_prompt):
+            return None
+        if is_refusal(generated_prompt):
+            return ""
+        return generated_prompt
 
 
 if __name__ == "__main__":
@@ -1,29 +1,86 @@
 # asr/whisper_asr.py
 
+import logging
 import whisper
 import torch
+import numpy as np
+from config import WHISPER_BACKEND
+
+logger = logging.getLogger(__name__)
+
+
+def pick_compute_type(device: str) -> str:
+    """
+    Choose the faster-whisper compute type for a device: int8 weights, with
+    bfloat16 activations on Ampere (SM 8.0) and newer, float16 on older GPUs.
+    """
+    if device != 'cuda':
+        return 'int8'
+    major, _ = torch.cuda.get_device_capability()
+    return 'int8_bfloat16' if major >= 8 else 'int8_float16'
 
 
 class WhisperASR:
-    def __init__(self, model_path="base"):
+    def __init__(self, model_path="base", backend=WHISPER_BACKEND):
         """
         Initialize the Whisper ASR model.
-        """
-        device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        print(device)
-        self.model = whisper.load_model(model_path).to(device)
 
-    def transcribe(self, audio_file_path: str) -> str:
+        Parameters:
+        - model_path: Whisper model size or path.
+        - backend: 'whisper' for openai-whisper, or 'faster-whisper' for the
+          CTranslate2 int8 runtime.
+        """
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.backend = backend
+        if self.backend == 'faster-whisper':
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                logger.warning("faster-whisper is not installed, falling back to openai-whisper")
+                self.backend = 'whisper'
+
+        logger.info("Loading Whisper model %s on %s with %s", model_path, self.device, self.backend)
+        if self.backend == 'faster-whisper':
+            self.model = WhisperModel(model_path, device=self.device, compute_type=pick_compute_type(self.device))
+        else:
+            # Weights stay fp32: whisper casts them per call and runs LayerNorm in fp32,
+            # so fp16 is requested at transcribe/decode time instead
+            self.model = whisper.load_model(model_path).to(self.device)
+
+    def warmup(self):
         """
-        Transcribe the provided audio file using the Whisper ASR model.
+        Run one second of silence through the model so the weights, CUDA context
+        and decoding kernels are initialized before the first real transcription.
+        """
+        silence = np.zeros(whisper.audio.SAMPLE_RATE, dtype=np.float32)
+        if self.backend == 'faster-whisper':
+            # Segments are decoded lazily, so consume them to actually run the model
+            segments, _ = self.model.transcribe(silence)
+            list(segments)
+        else:
+            self.model.transcribe(silence, fp16=self.device == 'cuda')
+
+    def transcribe(self, audio) -> str:
+        """
+        Transcribe the provided audio using the Whisper ASR model.
 
         Parameters:
-        - audio_file_path: Path to the audio file to be transcribed.
+        - audio: Path to the audio file, or mono float32 samples at 16 kHz.
 
         Returns:
         - Transcribed text as a string.
         """
-        result = self.model.transcribe(audio_file_path)
+        if self.backend == 'faster-whisper':
+            # The VAD filter skips silent stretches before they reach the decoder; greedy
+            # decoding (beam_size=1) matches openai-whisper's default and is several times cheaper
+            segments, _ = self.model.transcribe(audio, beam_size=1, vad_filter=True)
+            return "".join(segment.text for segment in segments)
+
+        if isinstance(audio, np.ndarray) and self.device == 'cuda':
+            # Whisper computes the mel spectrogram wherever the samples live, so run the STFT on the GPU
+            audio = torch.from_numpy(audio).to(self.device)
+
+        result = self.model.transcribe(audio, fp16=self.device == 'cuda')
         return result["text"]
 
     def detailed_transcription(self, audio_file_path: str) -> dict:
@@ -37,17 +94,25 @@ class WhisperASR:
         Returns:
         - Dictionary containing transcribed text and detected language.
         """
-        # Load and preprocess the audio
+        if self.backend == 'faster-whisper':
+            segments, info = self.model.transcribe(audio_file_path)
+            return {
+                "text": "".join(segment.text for segment in segments),
+                "language": info.language
+            }
+
+        # Load and preprocess the audio, moving the samples to the model's device so the
+        # mel spectrogram is computed there
         audio = whisper.load_audio(audio_file_path)
-        audio = whisper.pad_or_trim(audio)
-        mel = whisper.log_mel_spectrogram(audio).to(self.model.device)
+        audio = whisper.pad_or_trim(torch.from_numpy(audio).to(self.model.device))
+        mel = whisper.log_mel_spectrogram(audio)
 
         # Detect language
         _, probs = self.model.detect_language(mel)
         detected_language = max(probs, key=probs.get)
 
         # Decode audio to text
-        options = whisper.DecodingOptions()
+        options = whisper.DecodingOptions(fp16=self.device == 'cuda')
         result = whisper.decode(self.model, mel, options)
 
         return {
@@ -0,0 +1,48 @@
+# config/openai_client.py
+
+import logging
+import threading
+import httpx
+from openai import OpenAI
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+from .settings import get_openai_api_key
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """
+    Return the process-wide OpenAI client. Every module shares its httpx
+    connection pool, so chat and image calls reuse the same keep-alive connections.
+    """
+    global _client
+    # Locked so the startup warm-up thread and the GUI thread can't build two clients
+    with _client_lock:
+        if _client is None:
+            if not HTTP2_AVAILABLE:
+                logger.warning("h2 is not installed, using HTTP/1.1 for the OpenAI API")
+            http_client = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=60.0),
+            )
+            _client = OpenAI(api_key=get_openai_api_key(), http_client=http_client)
+        return _client
+
+
+def warm_openai_connection():
+    """
+    Open a connection to the OpenAI API ahead of the first real request, so the
+    TLS handshake is already done when the pipeline needs it.
+    """
+    try:
+        # Best effort: give up quickly rather than retrying against a slow or unreachable network
+        get_openai_client().with_options(timeout=5, max_retries=0).models.list()
+    except Exception as e:
+        logger.warning("Could not pre-warm the OpenAI connection: %s", e)
@@ -1,15 +1,27 @@
 # config/settings.py
 
 import os
+import functools
 
 # ===== API Configuration =====
-OPENAI_API_KEY = os.environ.get('ADVENTURE_ART_OPENAI_API_KEY', '')
+@functools.lru_cache(maxsize=1)
+def get_openai_api_key():
+    """Read the OpenAI key on first use instead of at import, failing clearly if it is unset."""
+    api_key = os.environ.get('ADVENTURE_ART_OPENAI_API_KEY')
+    if not api_key:
+        raise RuntimeError("ADVENTURE_ART_OPENAI_API_KEY is not set")
+    return api_key
+
 OPENAI_MODEL = 'gpt-4-1106-preview'
+OPENAI_NLP_MODEL = os.environ.get('OPENAI_NLP_MODEL', 'gpt-3.5-turbo-1106')  # Scene tracking, NER and summaries
+OPENAI_PROMPT_MODEL = os.environ.get('OPENAI_PROMPT_MODEL', 'gpt-3.5-turbo-1106')  # Image prompts; OPENAI_MODEL is the fallback
 
 # ===== Audio Configuration =====
 AUDIO_SAMPLE_RATE = 44100
 AUDIO_CHANNELS = 2  # Stereo
 AUDIO_FORMAT = 'wav'  # Default audio format
+WHISPER_MODEL = 'medium.en'
+WHISPER_BACKEND = os.environ.get('WHISPER_BACKEND', 'faster-whisper')  # 'faster-whisper' or 'whisper'
 
 # ===== File Paths & Directories =====
 LOG_DIR = 'logs/'
@@ -23,6 +35,7 @@ DEFAULT_FONT = 'Arial 12'
 # ===== Environment Settings =====
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
 DEBUG = True if ENVIRONMENT == 'development' else False
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
 
 # ===== Rate Limits & Quotas =====
 WHISPER_RATE_LIMIT = 1000  # Example value, requests per hour
@@ -33,3 +46,8 @@ DATABASE_URI = os.environ.get('DATABASE_URI', 'default_db_connection_string')
 
 # ===== Additional Constants or Configuration =====
 DEFAULT_PROMPT_LENGTH = 200
+PROMPT_CACHE_SIZE = 128  # Image prompts remembered per scene + transcript
+MIN_TRANSCRIPT_WORDS = 3  # Shorter transcripts skip scene, NER and image generation
+IMAGE_PROMPT_MAX_TOKENS = 300  # Completion cap for image prompts
+SUMMARY_MAX_TOKENS = 250  # Completion cap for scene summaries
+SUMMARY_MAX_ATTEMPTS = 3  # Failed summaries retried on later chunks before the scene is dropped
@@ -1,14 +1,28 @@
 #database/db_manager.py
 from datetime import datetime
 from database.models import Base, Character, Scene, SceneCharacter, Narrative, CharacterDescriptor
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside a writer, and with it NORMAL sync only fsyncs at checkpoints
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
 class DatabaseManager:
     def __init__(self, db_url='sqlite:///dnd_database.db'):
         self.engine = create_engine(db_url, echo=False)
-        self.Session = sessionmaker(bind=self.engine)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', set_sqlite_pragmas)
+        # This session is the only writer, so loaded objects stay valid across commits
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
         self.session = self.Session()
+        self._current_scene = None  # Cached active scene, kept in sync by the scene writers
+        self._characters_by_name = {}  # Characters already loaded or created, by name
 
     def create_all(self):
         Base.metadata.create_all(self.engine)
@@ -17,39 +31,38 @@ class DatabaseManager:
         scene = self.get_current_scene()
         character = self.get_character_by_name(name)
         if character is None:
-            character = Character(name=name)
-            self.session.add(character)
-            self.session.commit()  # Ensure character is committed to get an ID
+            character = self.add_character(name, None, commit=False)
 
         for descriptor in descriptors:
+            # Link through the relationships so character.descriptors stays current in memory
             char_descriptor = CharacterDescriptor(
-                character_id=character.id,
-                scene_id=scene.id,
+                character=character,
+                scene=scene,
                 descriptor=descriptor
             )
             self.session.add(char_descriptor)
-        self.session.commit()
+        self.session.commit()  # One transaction for the character and all its descriptors
         return character
 
     # The summarize_scene function
     def create_new_scene(self, scene_description, characters_present):
         # End the current scene
-        ended_scene = self.end_current_scene()
-
-
+        ended_scene = self.end_current_scene(commit=False)
 
         # Create a new scene
         new_scene = Scene(title=scene_description, summary=scene_description, is_active=True)
         self.session.add(new_scene)
-        self.session.commit()
 
         # Update characters and descriptors
         for char_name in characters_present:
             character = self.get_character_by_name(char_name)
             if character is None:
-                character = self.add_character(char_name, "")
-            self.link_character_scene(character, new_scene)
+                character = self.add_character(char_name, "", commit=False)
+            self.link_character_scene(character, new_scene, commit=False)
 
+        # Ending the old scene and creating the new one land atomically in one transaction
+        self.session.commit()
+        self._current_scene = new_scene
         return new_scene
 
     def update_current_scene(self, scene_title, scene_description, characters_present):
@@ -57,45 +70,52 @@ class DatabaseManager:
         # Update scene description
         scene.title = scene_title
         scene.summary = scene_description
-        self.session.commit()  # Commit the updated scene description
 
         # Update characters and descriptors
         for char_name in characters_present:
             character = self.get_character_by_name(char_name)
             if character is None:
-                character = self.add_character(char_name, "")  # Assuming empty string for description
-            self.link_character_scene(character, scene)  # Assuming character is present in the scene
+                character = self.add_character(char_name, "", commit=False)  # Assuming empty string for description
+            self.link_character_scene(character, scene, commit=False)  # Assuming character is present in the scene
 
+        self.session.commit()  # Commit the scene description and character links together
         return scene  # Return the updated scene object
 
-    def end_current_scene(self):
+    def end_current_scene(self, commit=True):
         current_scene = self.get_current_scene()
         if current_scene:
             current_scene.is_active = False
-            self.session.commit()
+            if commit:
+                self.session.commit()
+        self._current_scene = None
         return current_scene
 
     def get_current_scene(self):
-        # Get the first active scene
-        current_scene = self.session.query(Scene).filter_by(is_active=True).first()
-        return current_scene
+        # Get the first active scene, querying only when nothing is cached
+        if self._current_scene is None:
+            self._current_scene = self.session.query(Scene).filter_by(is_active=True).first()
+        return self._current_scene
 
-    def add_character(self, name, description):
+    def add_character(self, name, description, commit=True):
         character = Character(name=name, description=description)
         self.session.add(character)
-        self.session.commit()
+        if commit:
+            self.session.commit()
+        self._characters_by_name[name] = character
         return character
 
     def add_scene(self, title, summary):
         scene = Scene(title=title, summary=summary)
         self.session.add(scene)
         self.session.commit()
+        self._current_scene = None  # New scenes default to active
         return scene
 
-    def link_character_scene(self, character, scene, is_present=True):
+    def link_character_scene(self, character, scene, is_present=True, commit=True):
         scene_character = SceneCharacter(character=character, scene=scene, is_present=is_present)
         self.session.add(scene_character)
-        self.session.commit()
+        if commit:
+            self.session.commit()
         return scene_character
 
     def add_narrative(self, summary, scene, timestamp=None):
@@ -107,7 +127,13 @@ class DatabaseManager:
         return narrative
 
     def get_character_by_name(self, name):
-        return self.session.query(Character).filter_by(name=name).first()
+        # Names are unique and only this session writes them, so a hit never goes stale
+        character = self._characters_by_name.get(name)
+        if character is None:
+            character = self.session.query(Character).filter_by(name=name).first()
+            if character is not None:
+                self._characters_by_name[name] = character
+        return character
 
     def get_scene_by_title(self, title):
         return self.session.query(Scene).filter_by(title=title).first()
@@ -1,9 +1,23 @@
 import io
-import requests
+import functools
+import logging
 import threading
 from PIL import Image, ImageTk
 import tkinter as tk
 
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=1)
+def _get_session():
+    """Build the download session on first URL fetch; images normally arrive inline as bytes."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    # Shared across downloads so repeat fetches from the image CDN reuse keep-alive connections
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
 class Display:
     def __init__(self, root):
         self.root = root
@@ -11,20 +25,29 @@ class Display:
         self.label.pack()
         self.photo = None  # Keep a reference to the PhotoImage
 
-    def show_image(self, image_url):
-        # Schedule the _update_image method to be called on the main thread
-        self.root.after(0, self._update_image, image_url)
+    def show_image(self, image):
+        # Accepts image bytes or a URL; may be called from a worker thread
+        if isinstance(image, (bytes, bytearray)):
+            self.root.after(0, lambda: self._update_image(image))
+        else:
+            # Download off the main thread; _update_image is scheduled back on it once done
+            self._load_image_async(image)
 
     def _load_image_async(self, image_url):
         def fetch_and_update():
             try:
-                response = requests.get(image_url)
-                image_data = response.content
+                # Stream the body in chunks instead of buffering it through response.content
+                buffer = io.BytesIO()
+                with _get_session().get(image_url, stream=True, timeout=(5, 60)) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size=65536):
+                        buffer.write(chunk)
+                image_data = buffer.getvalue()
                 self.root.after(0, lambda: self._update_image(image_data))
             except Exception as e:
-                print(f"Error fetching image: {e}")
+                logger.exception("Error fetching image: %s", e)
 
-        threading.Thread(target=fetch_and_update).start()
+        threading.Thread(target=fetch_and_update, daemon=True).start()
 
     def _update_image(self, image_data):
         try:
@@ -32,4 +55,4 @@ class Display:
             self.photo = ImageTk.PhotoImage(image)
             self.label.configure(image=self.photo)
         except Exception as e:
-            print(f"Error updating image: {e}")
+            logger.exception("Error updating image: %s", e)
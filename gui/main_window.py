@@ -1,9 +1,13 @@
 # main_window.py
 import tkinter as tk
+import logging
 import os
 import random
+import wave
 import glob
-from input.audio_capture import AudioCapture
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from input.audio_capture import AudioCapture, load_wav_samples
 from asr.whisper_asr import WhisperASR
 from api_parser.openai_parser import OpenAIParser
 from nlp.named_entity_recognition import named_entity_recognizer
@@ -11,13 +15,32 @@ from nlp.scene_understanding import scene_processor
 from image_generator.text_to_image import TextToImage
 from database.db_manager import DatabaseManager
 from gui.display_image import Display
-from utils.utils import scene_to_text, numerical_sort
+from utils.utils import scene_to_text, numerical_sort, has_enough_speech
+from config import WHISPER_MODEL, WHISPER_BACKEND, MIN_TRANSCRIPT_WORDS
+from config.openai_client import warm_openai_connection
+
+logger = logging.getLogger(__name__)
 
 class MainWindow:
     def __init__(self, root):
         self.root = root
         self.root.title("Adventure Art")
 
+        # Worker threads keep the audio pipeline off the Tk main loop. Chunks are still
+        # processed one at a time; the second worker overlaps stages within a chunk.
+        # Consecutive chunks (and the Whisper load) land on whichever worker is idle, so the
+        # SQLAlchemy session is used from more than one thread. That is safe only because
+        # database access is sequential and SQLAlchemy 2.0 turns off SQLite's
+        # check_same_thread for file databases; don't touch the database from two workers at once.
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.stopping = False  # Set when the window closes; the pipeline stops scheduling work
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Open the OpenAI connection and load Whisper in the background so the window shows at once.
+        # The warm-up gets its own daemon thread so it never holds a pipeline worker
+        threading.Thread(target=warm_openai_connection, daemon=True).start()
+        self._asr_future = self.executor.submit(self.load_asr)
+
         # Initialize other components
         self.db_manager = DatabaseManager()
         self.scene_processor_instance = scene_processor(self.db_manager)
@@ -26,10 +49,11 @@ class MainWindow:
         self.image_generator = TextToImage()
         self.display = Display(root)
 
+        self.transcript_cache = {}  # (path, mtime, size) of a sample file -> its transcription
+
         self.debug = True  # Set debug mode
         self.file_pointer = 0  # Initialize file pointer
         self.labeled_audio_files = sorted(glob.glob('dnd_sample/*.wav'), key=numerical_sort)
-        self.current_scene = None
 
         if self.debug:        
             self.file_pointer = random.randint(0, len(self.labeled_audio_files) - 1)  # Randomly initialize the file pointer
@@ -38,6 +62,28 @@ class MainWindow:
         self.setup_gui()
 
 
+    def load_asr(self):
+        # Load Whisper once and warm it up so no chunk pays the model load
+        asr = None
+        try:
+            asr = WhisperASR(WHISPER_MODEL)
+            asr.warmup()
+        except Exception:
+            # CTranslate2 can fail at build or first inference (missing CUDA/cuDNN libraries,
+            # unsupported compute type); fall back to openai-whisper rather than failing every chunk
+            backend = asr.backend if asr is not None else WHISPER_BACKEND
+            if backend != 'faster-whisper':
+                raise
+            logger.exception("faster-whisper failed to load, falling back to openai-whisper")
+            asr = WhisperASR(WHISPER_MODEL, backend='whisper')
+            asr.warmup()
+        return asr
+
+    @property
+    def asr(self):
+        # Blocks only if a chunk arrives before the background load has finished
+        return self._asr_future.result()
+
     def setup_gui(self):
         # Create and place GUI components here
         # Example: Button to start processing
@@ -45,74 +91,135 @@ class MainWindow:
         self.start_button.pack()
 
     def start_processing(self):
+        self.start_button.config(state=tk.DISABLED)
         self.periodic_update()
 
     def periodic_update(self):
+        if self.stopping:
+            return
+
         # Check if all files have been processed in debug mode
         if self.debug and self.file_pointer >= len(self.labeled_audio_files):
             return 
 
-        self.process_audio_file()
-        self.root.after(1000, self.periodic_update)  # Schedule the next update
+        # Hand the chunk to the worker thread so the GUI stays responsive
+        future = self.executor.submit(self.process_audio_file)
+        future.add_done_callback(self.on_processing_done)
+
+    def on_processing_done(self, future):
+        if self.stopping or future.cancelled():
+            return
+        error = future.exception()
+        if error:
+            logger.error("Error processing audio: %s", error, exc_info=error)
+        try:
+            self.root.after(1000, self.periodic_update)  # Schedule the next update
+        except (RuntimeError, tk.TclError):
+            pass  # The window closed while this chunk was finishing
+
+    def on_close(self):
+        # Stop rescheduling, drop queued work and let the running chunk bail out at its next stage
+        self.stopping = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
     def process_audio_file(self):
         # 1. Capture audio
-        audio_file_path = self.capture_audio()
+        audio = self.capture_audio()
+
+        if self.stopping:
+            return
 
         # 2. Transcribe audio to text
-        transcription = self.transcribe_audio(audio_file_path)
+        transcription = self.transcribe_audio(audio)
 
-        # 3. Scene Understanding
-        self.scene_processor_instance.process_scene_text(transcription)
+        if self.stopping:
+            return
 
-        # 4. Named Entity Recognition
-        self.named_entity_recognizer_instance.identify_named_entities(transcription)
+        # Silence and filler never produce an image, so skip the language model stages
+        if not has_enough_speech(transcription, MIN_TRANSCRIPT_WORDS):
+            logger.info("Transcription too short, skipping scene and image generation")
+            return
 
-        # 5. Update current scene
-        self.current_scene = self.db_manager.get_current_scene()
+        # 3. Named Entity Recognition only needs the transcript and a scene snapshot,
+        # so request it in parallel with scene understanding. Only the API request runs on
+        # the other worker; the database writes stay on this thread. The model therefore sees
+        # the scene from before this chunk's update, while apply_named_entities writes the
+        # descriptors to the scene as it stands after the update, which may be a new scene.
+        current_scene = self.db_manager.get_current_scene()
+        scene_text = scene_to_text(current_scene) if current_scene else None
+        entities_future = self.executor.submit(
+            self.named_entity_recognizer_instance.request_named_entities, transcription, scene_text)
+
+        # 4. Scene Understanding, then apply the entities once the scene is up to date
+        self.scene_processor_instance.process_scene_text(transcription, scene_text)
+        self.named_entity_recognizer_instance.apply_named_entities(entities_future.result())
+
+        # 5. Update current scene, kept local rather than on self since it is read on the worker
+        current_scene = self.db_manager.get_current_scene()
 
         # 6. Generate a descriptive prompt for image generation
-        prompt = self.generate_prompt(self.current_scene, transcription)
+        prompt = self.generate_prompt(current_scene, transcription)
 
-        if prompt:
+        if prompt and not self.stopping:
             self.generate_and_display_image(prompt)
 
-        # Clean up the temporary audio file
-        self.cleanup_audio_file(audio_file_path)
+        # 7. Summarize ended scenes after the image, off the critical path
+        self.scene_processor_instance.summarize_pending_scenes()
 
     def capture_audio(self):
         if self.debug:
-            audio_file_path = self.labeled_audio_files[self.file_pointer]
+            audio = self.labeled_audio_files[self.file_pointer]
             self.file_pointer = (self.file_pointer + 1) % len(self.labeled_audio_files)
+            logger.debug("Audio loaded from %s", audio)
         else:
-            capturer = AudioCapture(debug=True)
-            audio_file_path = capturer.capture_audio(30)
+            # Keep live recordings in memory and hand the samples straight to Whisper
+            capturer = AudioCapture()
+            audio = capturer.capture_samples(30)
             capturer.close()
-        print(f"Audio captured and saved to {audio_file_path}")
-        return audio_file_path
-
-    def transcribe_audio(self, audio_file_path):
-        asr = WhisperASR("medium.en")
-        transcription = asr.transcribe(audio_file_path)
-        print(f"Transcription: {transcription}")
+            logger.debug("Audio captured")
+        return audio
+
+    def transcribe_audio(self, audio):
+        # Sample files repeat as debug mode cycles through them; only transcribe each version once
+        cache_key = None
+        if isinstance(audio, str):
+            stat = os.stat(audio)
+            cache_key = (audio, stat.st_mtime_ns, stat.st_size)
+
+        transcription = self.transcript_cache.get(cache_key)
+        if transcription is None:
+            if cache_key is not None:
+                audio = self.load_audio_file(audio)
+            transcription = self.asr.transcribe(audio)
+            if cache_key is not None:
+                self.transcript_cache[cache_key] = transcription
+
+        logger.info("Transcription: %s", transcription)
         return transcription
 
+    def load_audio_file(self, file_path):
+        # Decode WAVs in-process; anything wave can't read is left for Whisper's ffmpeg loader
+        try:
+            return load_wav_samples(file_path)
+        except (wave.Error, ValueError, EOFError) as e:
+            logger.debug("Could not decode %s in-process: %s", file_path, e)
+            return file_path
+
     def generate_prompt(self, current_scene, transcription):
         prompt = self.parser_instance.generate_prompt(current_scene, transcription)
         if not prompt:
-            print("Text is not visualizable")
+            logger.info("Text is not visualizable")
         else:
-            print(f"Generated Prompt: {prompt}")
+            logger.info("Generated Prompt: %s", prompt)
         return prompt
 
     def generate_and_display_image(self, prompt):
-        image_path = self.image_generator.generate_image(prompt)
-        print(f"Image generated and saved to {image_path}")
-        self.display.show_image(image_path)
-
-    def cleanup_audio_file(self, audio_file_path):
-        if not self.debug:
-            os.remove(audio_file_path)
+        image_data = self.image_generator.generate_image(prompt)
+        if image_data is None:
+            return
+        logger.debug("Image generated (%d bytes)", len(image_data))
+        self.display.show_image(image_data)
 
 
 if __name__ == "__main__":
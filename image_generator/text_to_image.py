@@ -1,11 +1,14 @@
 # image_generator/text_to_image.py
-import openai
-from config.settings import OPENAI_API_KEY
+import base64
+import logging
+from config.openai_client import get_openai_client
+
+logger = logging.getLogger(__name__)
 
 class TextToImage:
     def __init__(self):
-        # Initialize the OpenAI client
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        # Use the shared OpenAI client
+        self.client = get_openai_client()
 
     def generate_image(self, prompt, size="1024x1024", quality="standard"):
         try:
@@ -15,18 +18,18 @@ class TextToImage:
                 prompt=prompt,
                 size=size,
                 quality=quality,
-                n=1
+                n=1,
+                response_format="b64_json"
             )
-            # Extract the URL of the generated image
-            image_url = response.data[0].url
-            return image_url
+            # Return the image bytes inline rather than a URL that needs a second download
+            return base64.b64decode(response.data[0].b64_json)
         except Exception as e:
-            print(f"An error occurred while generating the image: {e}")
+            logger.exception("An error occurred while generating the image: %s", e)
             return None
 
 if __name__ == "__main__":
     # For testing purposes
     image_generator = TextToImage()
     prompt = "A scenic view of mountains during sunset"
-    image_url = image_generator.generate_image(prompt)
-    print(f"Generated Image URL: {image_url}")
+    image_data = image_generator.generate_image(prompt)
+    print(f"Generated image: {len(image_data) if image_data else 0} bytes")
@@ -1,12 +1,84 @@
+import logging
 import pyaudio
 import wave
 import os
 import tempfile
 import random
+import numpy as np
+import torch
+import torchaudio.functional
 
 # Import the configuration from settings.py
 from config import AUDIO_SAMPLE_RATE, AUDIO_CHANNELS, AUDIO_FORMAT
 
+logger = logging.getLogger(__name__)
+
+SAMPLE_DIR = "dnd_sample"
+WHISPER_SAMPLE_RATE = 16000  # Whisper expects 16 kHz mono float32 audio
+
+# Listing of SAMPLE_DIR, only rescanned when the directory's mtime changes
+_sample_files_cache = {"dir_mtime": None, "files": []}
+
+
+def list_sample_files() -> list:
+    """
+    List the WAV files in the dnd_sample folder, reusing the previous scan
+    while the folder is unchanged.
+
+    Returns:
+        list: File names of the WAV files.
+    """
+    dir_mtime = os.stat(SAMPLE_DIR).st_mtime_ns
+    if dir_mtime != _sample_files_cache["dir_mtime"]:
+        with os.scandir(SAMPLE_DIR) as entries:
+            _sample_files_cache["files"] = [entry.name for entry in entries if entry.name.endswith(".wav")]
+        _sample_files_cache["dir_mtime"] = dir_mtime
+    return _sample_files_cache["files"]
+
+
+def to_whisper_samples(samples: np.ndarray, sample_rate: int, channels: int) -> np.ndarray:
+    """
+    Downmix interleaved float32 samples to mono and resample them to 16 kHz.
+
+    Returns:
+        np.ndarray: Mono float32 samples at 16 kHz.
+    """
+    samples = samples.reshape(-1, channels).mean(axis=1).astype(np.float32)
+    if sample_rate == WHISPER_SAMPLE_RATE:
+        return samples
+
+    # Band-limited resampling, so content above 8 kHz (sibilants, fricatives) is filtered
+    # out instead of aliasing back into the speech band
+    resampled = torchaudio.functional.resample(torch.from_numpy(samples), sample_rate, WHISPER_SAMPLE_RATE)
+    return resampled.numpy()
+
+
+def load_wav_samples(file_path: str) -> np.ndarray:
+    """
+    Decode a PCM WAV file in-process, so Whisper doesn't spawn ffmpeg to read it.
+
+    Returns:
+        np.ndarray: Mono float32 samples at 16 kHz.
+
+    Raises:
+        ValueError: If the file uses a sample width other than 8, 16 or 32 bits.
+    """
+    with wave.open(file_path, 'rb') as wf:
+        channels = wf.getnchannels()
+        sample_width = wf.getsampwidth()
+        sample_rate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+
+    return to_whisper_samples(samples, sample_rate, channels)
 
 class AudioCapture:
     def __init__(self, debug=False):
@@ -25,15 +97,50 @@ class AudioCapture:
         """
 
         if self.debug:
-            print("Debug mode active: Randomly selecting a pre-recorded file...")
+            logger.debug("Debug mode active: Randomly selecting a pre-recorded file...")
             return self.select_random_file()
 
+        audio_data = self.record(duration)
+
+        # Use a temporary file to store the audio
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f".{AUDIO_FORMAT}")
+        file_path = temp_file.name
+
+        # Save audio data to the temporary file in WAV format
+        with wave.open(file_path, 'wb') as wf:
+            wf.setnchannels(AUDIO_CHANNELS)
+            wf.setsampwidth(self.audio.get_sample_size(self.format))
+            wf.setframerate(AUDIO_SAMPLE_RATE)
+            wf.writeframes(audio_data)
+
+        return file_path
+
+    def capture_samples(self, duration: int) -> np.ndarray:
+        """
+        Capture audio for a specified duration in seconds and return it in memory,
+        ready for Whisper, without writing a temporary file.
+
+        Returns:
+            np.ndarray: Mono float32 samples at 16 kHz.
+        """
+        audio_data = self.record(duration)
+
+        samples = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+        return to_whisper_samples(samples, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS)
+
+    def record(self, duration: int) -> bytes:
+        """
+        Record raw 16-bit PCM from the microphone for a specified duration in seconds.
+
+        Returns:
+            bytes: Interleaved PCM frames.
+        """
         # Create a stream for audio capture
         stream = self.audio.open(format=self.format, channels=AUDIO_CHANNELS,
                                  rate=AUDIO_SAMPLE_RATE, input=True,
                                  frames_per_buffer=self.chunk_size)
 
-        print("Recording...")
+        logger.debug("Recording...")
 
         frames = []
 
@@ -42,24 +149,13 @@ class AudioCapture:
             data = stream.read(self.chunk_size)
             frames.append(data)
 
-        print("Recording finished.")
+        logger.debug("Recording finished.")
 
         # Stop and close the audio stream
         stream.stop_stream()
         stream.close()
 
-        # Use a temporary file to store the audio
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f".{AUDIO_FORMAT}")
-        file_path = temp_file.name
-
-        # Save audio data to the temporary file in WAV format
-        with wave.open(file_path, 'wb') as wf:
-            wf.setnchannels(AUDIO_CHANNELS)
-            wf.setsampwidth(self.audio.get_sample_size(self.format))
-            wf.setframerate(AUDIO_SAMPLE_RATE)
-            wf.writeframes(b''.join(frames))
-
-        return file_path
+        return b''.join(frames)
 
     def select_random_file(self) -> str:
         """
@@ -68,11 +164,11 @@ class AudioCapture:
         Returns:
             str: Path to the randomly selected WAV file.
         """
-        chunk_files = [f for f in os.listdir("dnd_sample") if f.endswith(".wav")]
+        chunk_files = list_sample_files()
         if not chunk_files:
             raise FileNotFoundError("No WAV files found in the dnd_sample folder")
         selected_file = random.choice(chunk_files)
-        return os.path.join("dnd_sample", selected_file)
+        return os.path.join(SAMPLE_DIR, selected_file)
 
     def close(self):
         """
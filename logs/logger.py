@@ -0,0 +1,35 @@
+# logs/logger.py
+
+import atexit
+import logging
+import logging.handlers
+import queue
+
+from config import LOG_LEVEL
+
+_log_queue = queue.Queue(-1)
+_listener = None
+
+
+def setup_logging():
+    """
+    Configure the root logger to hand records to a queue. A background listener
+    thread formats them and writes to stderr, so pipeline threads never block on it.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    _listener = logging.handlers.QueueListener(_log_queue, stream_handler)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(LOG_LEVEL)
+    root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
+    # httpx logs every request at INFO, which would bury the transcript and prompt lines
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -6,8 +6,10 @@ load_dotenv()
 
 import tkinter as tk
 from gui.main_window import MainWindow
+from logs.logger import setup_logging
 
 def main():
+    setup_logging()
     root = tk.Tk()
     app = MainWindow(root)
     root.mainloop()
@@ -1,51 +1,65 @@
 import json
 from database import DatabaseManager
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL
+from config.settings import OPENAI_NLP_MODEL
+from config.openai_client import get_openai_client
 from utils.utils import scene_to_text
-from openai import OpenAI
+
+SYSTEM_PROMPT = "You are a helpful assistant for identifying named entities. only respond with defined functions."
+SCENE_PREFIX = "The most recent scene object is: "
+USER_PREFIX = "Identify the characters and scenes in the following text: "
+
+# Static schema, built once instead of on every call
+FUNCTIONS = [
+    {
+        "name": "update_character_descriptors",
+        "description": "Update the character descriptors in the database.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "descriptors": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["name", "descriptors", "scene"]
+        }
+    }
+]
 
 
 class named_entity_recognizer:
     def __init__(self, db_manager):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.db_manager = db_manager
 
     def identify_named_entities(self, text: str):
         """Identify named entities in a given text."""
+        current_scene = self.db_manager.get_current_scene()
+        scene_text = scene_to_text(current_scene) if current_scene else None
+        function_call = self.request_named_entities(text, scene_text)
+        return self.apply_named_entities(function_call)
 
-        # Prepare function descriptions for OpenAI API call
-        functions = [
-            {
-                "name": "update_character_descriptors",
-                "description": "Update the character descriptors in the database.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string"},
-                        "descriptors": {"type": "array", "items": {"type": "string"}}
-                    },
-                    "required": ["name", "descriptors", "scene"]
-                }
-            }
-        ]
-
-        # Prepare messages for OpenAI API call
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant for identifying named entities. only respond with defined functions."},
-            {"role": "user", "content": f"Identify the characters and scenes in the following text: {text}"}
-        ]
+    def request_named_entities(self, text: str, scene_text: str = None):
+        """
+        Ask the model for the named entities in the text without touching the database,
+        so it can run concurrently with other pipeline stages.
 
-        current_scene = self.db_manager.get_current_scene()
+        Returns:
+            tuple: (function_name, function_args) or None if no function was called.
+        """
+
+        # Prepare messages for OpenAI API call, stable content first and the new transcript last
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
 
         # If a current scene is provided, include it in the messages to provide context to the model
-        if current_scene:
-            messages.append({"role": "system", "content": f"The most recent scene object is: {scene_to_text(current_scene)}"})
+        if scene_text:
+            messages.append({"role": "system", "content": "".join((SCENE_PREFIX, scene_text))})
+
+        messages.append({"role": "user", "content": "".join((USER_PREFIX, text))})
 
         # Make OpenAI API call
         response = self.client.chat.completions.create(
-            model=OPENAI_MODEL,
+            model=OPENAI_NLP_MODEL,
             messages=messages,
-            functions=functions,
+            functions=FUNCTIONS,
         )
 
         # Process the response
@@ -57,9 +71,18 @@ class named_entity_recognizer:
             function_name = response_message.function_call.name
             # Parsing the arguments from JSON string to dictionary
             function_args = json.loads(response_message.function_call.arguments)
+            return function_name, function_args
+
+        return None
+
+    def apply_named_entities(self, function_call):
+        """Apply a function call returned by request_named_entities to the database."""
+        if function_call is None:
+            return None
 
-            if function_name == "update_character_descriptors":
-                return self.db_manager.update_character_descriptors(**function_args)
+        function_name, function_args = function_call
+        if function_name == "update_character_descriptors":
+            return self.db_manager.update_character_descriptors(**function_args)
 
 if __name__ == "__main__":
     text_sample = "In a dark and stormy night, Arthur and Merlin were devising a plan in the grand hall."
@@ -1,65 +1,82 @@
 # nlp/scene_understanding.py
-from openai import OpenAI
 import json
+import logging
 from database import DatabaseManager
 from nlp.summarization import Summarizer
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL
+from config.settings import OPENAI_NLP_MODEL, SUMMARY_MAX_ATTEMPTS
+from config.openai_client import get_openai_client
 from utils.utils import scene_to_text
-# Initialize your database manager
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a helpful assistant for understanding scenes and characters. only respond with defined functions."
+SCENE_PREFIX = "The most recent scene object is: "
+USER_PREFIX = "Process the following text to understand the scene and characters: "
+
+# Static schema, built once instead of on every call
+FUNCTIONS = [
+    {
+        "name": "create_new_scene",
+        "description": "Create a new scene entry in the database.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "scene_description": {"type": "string"},
+                "characters_present": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["scene_description", "characters_present", "characters_descriptors"]
+        }
+    },
+    {
+        "name": "update_current_scene",
+        "description": "Update the current scene entry in the database.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "scene_title": {"type": "string"},
+                "scene_description": {"type": "string"},
+                "characters_present": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["scene", "scene_title", "scene_description", "characters_present", "characters_descriptors"]
+        }
+    }
+]
 
 
 class scene_processor:
     def __init__(self, db_manager):
         self.summarizer = Summarizer(db_manager)
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.db_manager = db_manager
+        self.pending_summaries = []  # Ended scenes waiting for a narrative summary
+        self.summary_attempts = {}  # Scene id -> failed summary attempts so far
 
-    def process_scene_text(self, text: str):
-        """Process the text to understand the scene and update the database."""
-
-        functions = [
-            {
-                "name": "create_new_scene",
-                "description": "Create a new scene entry in the database.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "scene_description": {"type": "string"},
-                        "characters_present": {"type": "array", "items": {"type": "string"}},
-                    },
-                    "required": ["scene_description", "characters_present", "characters_descriptors"]
-                }
-            },
-            {
-                "name": "update_current_scene",
-                "description": "Update the current scene entry in the database.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "scene_title": {"type": "string"},
-                        "scene_description": {"type": "string"},
-                        "characters_present": {"type": "array", "items": {"type": "string"}},
-                    },
-                    "required": ["scene", "scene_title", "scene_description", "characters_present", "characters_descriptors"]
-                }
-            }
-        ]
-
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant for understanding scenes and characters. only respond with defined functions."},
-            {"role": "user", "content": f"Process the following text to understand the scene and characters: {text}"}
-        ]
+    def process_scene_text(self, text: str, scene_text: str = None):
+        """
+        Process the text to understand the scene and update the database.
+
+        scene_text may pass in scene_to_text of the current scene when the caller
+        already built it, so the string isn't rebuilt here.
+        """
+
+        # Stable content first and the new transcript last, so consecutive calls share a prompt prefix
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
 
         current_scene = self.db_manager.get_current_scene()
 
         if current_scene:
+            if scene_text is None:
+                scene_text = scene_to_text(current_scene)
             messages.append(
-                {"role": "system", "content": f"The most recent scene object is: {scene_to_text(current_scene)}"})
+                {"role": "system", "content": "".join((SCENE_PREFIX, scene_text))})
+
+        messages.append(
+            {"role": "user", "content": "".join((USER_PREFIX, text))})
 
         response = self.client.chat.completions.create(
-            model=OPENAI_MODEL,
+            model=OPENAI_NLP_MODEL,
             messages=messages,
-            functions=functions,
+            functions=FUNCTIONS,
         )
 
         # Updating the response handling to work with the new Pydantic model
@@ -73,15 +90,32 @@ class scene_processor:
                 response_message.function_call.arguments)
 
             if function_name == "create_new_scene":
-                # Summarize the ended scene
+                # Queue the ended scene for summarizing once the image is out
                 if current_scene:
-                    summary = self.summarizer.summarize_scene(current_scene)
-                    
+                    self.pending_summaries.append(current_scene)
+
                 return self.db_manager.create_new_scene(**function_args)
 
             elif function_name == "update_current_scene":
                 return self.db_manager.update_current_scene(**function_args)
 
+    def summarize_pending_scenes(self):
+        """Write the narrative summaries for scenes ended since the last call."""
+        while self.pending_summaries:
+            scene = self.pending_summaries[0]
+            # Only dequeue once the summary is written, so an API error retries it next chunk,
+            # up to SUMMARY_MAX_ATTEMPTS so one failing scene can't block the queue for good
+            try:
+                self.summarizer.summarize_scene(scene)
+            except Exception:
+                attempts = self.summary_attempts.get(scene.id, 0) + 1
+                if attempts < SUMMARY_MAX_ATTEMPTS:
+                    self.summary_attempts[scene.id] = attempts
+                    raise
+                logger.exception("Giving up on summarizing scene %s after %d attempts", scene.id, attempts)
+            self.summary_attempts.pop(scene.id, None)
+            self.pending_summaries.pop(0)
+
 
 if __name__ == "__main__":
     text_sample = "In a dark and stormy night, Arthur and Merlin were devising a plan in the grand hall."
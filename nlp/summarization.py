@@ -1,34 +1,39 @@
 #nlp/summarization.py
-from openai import OpenAI
 import json
 from database import DatabaseManager
 from database.models import Base, Character, Scene, SceneCharacter, Narrative, CharacterDescriptor
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL
+from config.settings import OPENAI_NLP_MODEL, SUMMARY_MAX_TOKENS
+from config.openai_client import get_openai_client
 from utils.utils import scene_to_text
+
+SYSTEM_PROMPT = ("You are a helpful assistant who summarizes scenes and character descriptions. "
+                 "Please provide a brief summary of the scene described by the user.")
+
 class Summarizer:
     def __init__(self, db_manager):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.db_manager = db_manager
 
     def summarize_scene(self, current_scene: Scene):
-        # Structure the messages for the chat completion
+        # Static instructions first, the scene last, so every request shares the same prefix
         messages = [
-            {"role": "system", 
-            "content": "You are a helpful assistant who summarizes scenes and character descriptions."},
-            {"role": "user",
-            "content": scene_to_text(current_scene)},
-            {"role": "system",
-            "content": "Please provide a brief summary of the scene described above."}
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": scene_to_text(current_scene)}
         ]
 
         # Call the OpenAI API
         response = self.client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=messages
+            model=OPENAI_NLP_MODEL,
+            messages=messages,
+            max_tokens=SUMMARY_MAX_TOKENS
         )
 
-        # Extract the summary from the response
-        summary = response.choices[0].message.content.strip()
+        # Extract the summary from the response; a filtered or missing reply becomes an empty summary
+        choice = response.choices[0]
+        if choice.finish_reason == "content_filter":
+            summary = ""
+        else:
+            summary = (choice.message.content or "").strip()
 
         # Update the narrative in the database with the summary
         narrative = self.db_manager.add_narrative(summary, current_scene)
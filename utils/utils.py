@@ -2,6 +2,11 @@
 
 import re
 
+# Words Whisper emits for hesitations and near-silence; they carry nothing to visualize
+FILLER_WORDS = frozenset({'uh', 'um', 'umm', 'hmm', 'mm', 'mhm', 'ah', 'er', 'oh'})
+_WORD_RE = re.compile(r"[a-z']+")
+_DIGITS_RE = re.compile(r'\d+')
+
 def scene_to_text(current_scene):
     """
     Convert a Scene object into a descriptive text string.
@@ -14,9 +19,12 @@ def scene_to_text(current_scene):
     """
     # Get characters and their descriptions from the current scene
     characters_info = []
-    for character in current_scene.characters:
+    # Sorted by name so the text is byte-identical between calls and keeps the prompt prefix cacheable
+    for character in sorted(current_scene.characters, key=lambda sc: sc.character.name or ''):
         char_general_description = character.character.description
-        char_scene_descriptors = ', '.join([descriptor.descriptor for descriptor in character.character.descriptors])
+        # Only this scene's descriptors; earlier scenes would grow the prompt with every chunk
+        char_scene_descriptors = ', '.join([descriptor.descriptor for descriptor in character.character.descriptors
+                                            if descriptor.scene_id == current_scene.id])
         char_info = f"{character.character.name} is {char_general_description} and in this scene is described as: {char_scene_descriptors}"
         characters_info.append(char_info)
     characters_info_str = '; '.join(characters_info)
@@ -29,8 +37,28 @@ def scene_to_text(current_scene):
 
     return scene_and_characters_info
 
+def has_enough_speech(text, min_words):
+    """
+    Check whether a transcript contains enough real words to be worth processing.
+
+    Args:
+        text (str): The transcript to check.
+        min_words (int): Minimum number of non-filler words required.
+
+    Returns:
+        bool: True if the transcript has at least min_words non-filler words.
+    """
+    # Scan lazily and stop as soon as enough real words have been seen
+    count = 0
+    for match in _WORD_RE.finditer(text.lower()):
+        if match.group() not in FILLER_WORDS:
+            count += 1
+            if count >= min_words:
+                return True
+    return min_words <= 0
+
 def numerical_sort(file):
-    numbers = re.findall(r'\d+', file)
+    numbers = _DIGITS_RE.findall(file)
     return [int(num) for num in numbers]
 
 # Now you can import scene_to_text from utils.py in other scripts and use it to convert a Scene object to text.